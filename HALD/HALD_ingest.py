@@ -1,6 +1,10 @@
+import csv
+import functools
+import mmap
 import os
 import time
 import requests
+from concurrent.futures import ThreadPoolExecutor
 from colorama import init, Fore, Style
 from neo4j import GraphDatabase
 
@@ -10,20 +14,61 @@ class KnowledgeGraphClient:
     def __init__(self):
         self.neo4j_uri = os.getenv("NEO4J_URI", "neo4j://localhost:7687")
         self.server_url = os.getenv("SERVER_URL", "http://kg-server:8080")
+        # ~20k rows per transaction is Neo4j's recommended UNWIND starting
+        # point; lower it if the server heap is tight, raise it if the page
+        # cache has headroom.
+        self.batch_size = int(os.getenv("KG_BATCH_SIZE", "20000"))
+        # One driver (and connection pool) per process; sessions are cheap,
+        # drivers are not.
+        self.driver = GraphDatabase.driver(
+            self.neo4j_uri,
+            max_connection_pool_size=16,
+            connection_acquisition_timeout=60,
+        )
+        # One query string per relationship type, reused across batches so
+        # the server's plan cache sees identical text every time.
+        self._rel_query_cache = {}
 
-    def load_csv_data(self, file_path):
+    def close(self):
+        self.driver.close()
+
+    def iter_csv_batches(self, file_path, batch_size=None):
+        if batch_size is None:
+            batch_size = self.batch_size
         try:
-            import csv
-            data = []
-            with open(file_path, 'r') as file:
-                reader = csv.DictReader(file, delimiter=',')
-                for row in reader:
-                    data.append(row)
-            self.log_status(f"Successfully loaded data from {file_path}")
-            return data
+            with open(file_path, 'rb') as file:
+                with mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                    # Scan the mapped file for newlines directly instead of
+                    # materializing the whole file as Python dicts up front;
+                    # writes can start as soon as the first batch is parsed.
+                    def lines():
+                        pos = 0
+                        size = mm.size()
+                        while pos < size:
+                            newline = mm.find(b'\n', pos)
+                            if newline == -1:
+                                newline = size
+                            yield mm[pos:newline].decode('utf-8').rstrip('\r')
+                            pos = newline + 1
+
+                    reader = csv.reader(lines())
+                    header = next(reader)
+                    # Rows stay positional lists until a batch is handed to the
+                    # driver; dicts only exist for the batch in flight.
+                    batch = []
+                    for row in reader:
+                        if not row:
+                            continue
+                        batch.append(row)
+                        if len(batch) >= batch_size:
+                            yield [dict(zip(header, r)) for r in batch]
+                            batch = []
+                    if batch:
+                        yield [dict(zip(header, r)) for r in batch]
+            self.log_status(f"Finished streaming {file_path}")
         except Exception as e:
             self.log_error(f"Failed to load {file_path}: {str(e)}")
-            return None
+            raise
 
     def validate_role_data(self, role):
         required_fields = [':START_ID', ':END_ID', 'relation', 'weight', 'method', ':TYPE']
@@ -34,166 +79,215 @@ class KnowledgeGraphClient:
             return False
         return True
     
-    def create_nodes(self, session, entities):
+    def create_nodes(self, session, entity_batches):
         try:
-            session.run("CREATE CONSTRAINT IF NOT EXISTS FOR (n:Entity) REQUIRE n.id IS UNIQUE")
-            
-            batch_size = 1000
-            total = len(entities)
             created = 0
-            
-            label_groups = {}
-            for entity in entities:
-                labels = entity[':LABEL'].replace(' ', '_').split(';')
-                combined_label = ':'.join(labels)
-                if combined_label not in label_groups:
-                    label_groups[combined_label] = []
-                label_groups[combined_label].append(entity)
-            
-            for labels, group in label_groups.items():
-                for i in range(0, len(group), batch_size):
-                    batch = group[i:i + batch_size]
+
+            for batch in entity_batches:
+                label_groups = {}
+                for entity in batch:
+                    # Typed Bolt parameters; the server then stores the value
+                    # without a per-row toInteger parse.
+                    entity['frequency'] = int(entity['frequency']) if entity['frequency'] else 0
+                    labels = entity[':LABEL'].replace(' ', '_').split(';')
+                    # Entity is the base label every node carries: the
+                    # relationship MATCH and the entity_id index are both
+                    # scoped to it, so without it lookups find nothing.
+                    combined_label = ':'.join(['Entity'] + [l for l in labels if l != 'Entity'])
+                    if combined_label not in label_groups:
+                        label_groups[combined_label] = []
+                    label_groups[combined_label].append(entity)
+
+                for labels, group in label_groups.items():
                     query = f"""
                     UNWIND $batch AS entity
                     CREATE (n:{labels} {{
                         entity_id: entity.`entity:ID`,
                         name: entity.name,
                         type: entity.type,
-                        frequency: toInteger(entity.frequency)
+                        frequency: entity.frequency
                     }})
                     """
-                    session.run(query, {"batch": batch})
-                    created += len(batch)
-                    if created % 100 == 0:
-                        self.log_status(f"Created {created}/{total} nodes")
-                
+                    session.execute_write(
+                        lambda tx, q=query, b=group: tx.run(q, {"batch": b}).consume())
+
+                created += len(batch)
+                if created % 10000 == 0:
+                    self.log_status(f"Created {created} nodes")
+
             self.log_status("Successfully created all nodes")
         except Exception as e:
             self.log_error(f"Failed to create nodes: {str(e)}")
 
-    def sanitize_relationship_type(self,rel_type):
+    @staticmethod
+    @functools.lru_cache(maxsize=None)
+    def sanitize_relationship_type(rel_type):
+        # Called once per row but the distinct :TYPE values are few, so the
+        # cache turns the per-character scan into a dict lookup.
         sanitized = ''.join(c for c in rel_type if c.isalnum() or c == '_')
         if sanitized[0].isdigit():
             sanitized = 'REL_' + sanitized
         return sanitized.upper()
 
-    def create_relationships(self, session, roles):
+    def _relationship_query(self, rel_type):
+        query = self._rel_query_cache.get(rel_type)
+        if query is None:
+            query = f"""
+            UNWIND $batch AS role
+            MATCH (source:Entity {{entity_id: role.`:START_ID`}}), (target:Entity {{entity_id: role.`:END_ID`}})
+            CREATE (source)-[r:{rel_type} {{
+                relation: role.relation,
+                weight: role.weight,
+                method: role.method
+            }}]->(target)
+            """
+            self._rel_query_cache[rel_type] = query
+        return query
+
+    def create_relationships(self, driver, role_batches):
         try:
-            self.log_status(f"Starting relationship creation with {len(roles) if roles else 0} roles")
-            if not roles:
-                self.log_error("No roles data provided")
-                return
-
-            if roles and len(roles) > 0:
-                self.log_status("First role data sample:")
-                self.log_status(str(roles[0]))
-                self.log_status("Validating role data structure...")
-                if not self.validate_role_data(roles[0]):
-                    raise ValueError("Invalid role data structure")
-
-            batch_size = 1000
-            total = len(roles)
+            self.log_status("Starting relationship creation")
+
             created = 0
+            validated = False
 
-            for i in range(0, total, batch_size):
-                batch = roles[i:i + batch_size]
+            def write_group(rel_type, roles_group):
+                query = self._relationship_query(rel_type)
+                # execute_write retries TransientError (e.g. deadlocks when two
+                # type-groups touch the same endpoint nodes) automatically.
+                with driver.session() as worker_session:
+                    worker_session.execute_write(
+                        lambda tx: tx.run(query, {'batch': roles_group}).consume())
+                return len(roles_group)
 
-                type_groups = {}
-                for role in batch:
-                    rel_type = self.sanitize_relationship_type(role[':TYPE'])
-                    if rel_type not in type_groups:
-                        type_groups[rel_type] = []
-                    type_groups[rel_type].append(role)
+            with ThreadPoolExecutor(max_workers=8) as executor:
+                pending = []
+                for batch in role_batches:
+                    if not validated:
+                        self.log_status("First role data sample:")
+                        self.log_status(str(batch[0]))
+                        self.log_status("Validating role data structure...")
+                        if not self.validate_role_data(batch[0]):
+                            raise ValueError("Invalid role data structure")
+                        validated = True
 
-                for rel_type, roles_group in type_groups.items():
-                    query = f"""
-                    UNWIND $batch AS role
-                    MATCH (source {{entity_id: role.`:START_ID`}}), (target {{entity_id: role.`:END_ID`}})
-                    MERGE (source)-[r:{rel_type} {{
-                        relation: role.relation,
-                        weight: toFloat(role.weight),
-                        method: role.method
-                    }}]->(target)
-                    RETURN source.entity_id, type(r), target.entity_id
-                    """
+                    # Partition by relationship type so each worker writes one
+                    # type-group; concurrent groups rarely contend on endpoints.
+                    type_groups = {}
+                    for role in batch:
+                        role['weight'] = float(role['weight']) if role['weight'] else 0.0
+                        rel_type = self.sanitize_relationship_type(role[':TYPE'])
+                        if rel_type not in type_groups:
+                            type_groups[rel_type] = []
+                        type_groups[rel_type].append(role)
 
-                    tx = session.begin_transaction()
-                    try:
-                        tx.run(query, {'batch': roles_group})
-                        tx.commit()
-                    except Exception as tx_error:
-                        tx.rollback()
-                        raise tx_error
-                
-                verify_query = """
-                UNWIND $types as type
-                MATCH ()-[r]-()
-                WHERE type(r) = type
-                WITH type, count(r) as count
-                RETURN type, count
-                """
-
-                types = [role[':TYPE'] for role in batch]
-
-                verify_result = session.run(verify_query, {
-                    'types': types
-                }).data()
-
-                if verify_result:
-                    self.log_status(f"Verification results: {verify_result}")
-                    created += len(batch)
-                    if created % 1000 == 0:
-                        self.log_status(f"Created {created}/{total} relationships")
-                else:
-                    self.log_warning(f"Batch verification failed for relationships {i} to {i+len(batch)}")
-                    # self.log_warning(f"Types being verified: {types}")
-                        
+                    for rel_type, roles_group in type_groups.items():
+                        pending.append(executor.submit(write_group, rel_type, roles_group))
+
+                    # Bound the queue so streamed batches don't pile up in memory
+                    if len(pending) >= 32:
+                        for future in pending:
+                            created += future.result()
+                        pending = []
+                        self.log_status(f"Created {created} relationships")
+
+                for future in pending:
+                    created += future.result()
+
+            with driver.session() as session:
+                type_counts = session.run(
+                    "MATCH ()-[r]->() RETURN type(r) as type, count(r) as count"
+                ).data()
+            self.log_status(f"Relationship counts by type: {type_counts}")
             self.log_status("Successfully created all relationships")
         except Exception as e:
             self.log_error(f"Failed to create relationships: {str(e)}")
             raise e
             
+    def _load_server_side(self, session, entities_file, roles_file):
+        """Load via LOAD CSV executed inside the server, avoiding Bolt row
+        shipping entirely. Only valid when the CSVs sit in the server's
+        import directory (referenced by basename); enabled with
+        KG_SERVER_IMPORT=1, otherwise the Bolt batching path runs."""
+        entities_name = os.path.basename(entities_file)
+        roles_name = os.path.basename(roles_file)
+
+        self.log_status(f"Loading nodes server-side from {entities_name}...")
+        node_query = f"""
+        CALL apoc.periodic.iterate(
+          "LOAD CSV WITH HEADERS FROM 'file:///{entities_name}' AS row RETURN row",
+          "CALL apoc.create.node(['Entity'] + split(replace(row.`:LABEL`, ' ', '_'), ';'),
+               {{entity_id: row.`entity:ID`, name: row.name, type: row.type,
+                 frequency: toInteger(row.frequency)}}) YIELD node RETURN count(*)",
+          {{batchSize: {self.batch_size}, parallel: true}})
+        """
+        session.run(node_query).consume()
+
+        self.log_status(f"Loading relationships server-side from {roles_name}...")
+        # Mirror sanitize_relationship_type in Cypher so this path yields the
+        # same type names as the Bolt loader: alnum/underscore only, REL_
+        # prefix on a leading digit, uppercased.
+        rel_query = f"""
+        CALL apoc.periodic.iterate(
+          "LOAD CSV WITH HEADERS FROM 'file:///{roles_name}' AS row RETURN row",
+          "WITH row, apoc.text.regreplace(row.`:TYPE`, '[^A-Za-z0-9_]', '') AS cleaned
+           WITH row, toUpper(CASE WHEN cleaned =~ '^[0-9].*' THEN 'REL_' + cleaned ELSE cleaned END) AS relType
+           MATCH (source:Entity {{entity_id: row.`:START_ID`}}), (target:Entity {{entity_id: row.`:END_ID`}})
+           CALL apoc.create.relationship(source, relType,
+               {{relation: row.relation, weight: toFloat(row.weight), method: row.method}},
+               target) YIELD rel RETURN count(*)",
+          {{batchSize: {self.batch_size}, parallel: false}})
+        """
+        session.run(rel_query).consume()
+
     def build_knowledge_graph(self, entities_file, roles_file):
         try:
-            entities = self.load_csv_data(entities_file)
-            roles = self.load_csv_data(roles_file)
-            
-            if not entities or not roles:
-                return False
-                
-            driver = GraphDatabase.driver(self.neo4j_uri)
-            
-            with driver.session() as session:
+            with self.driver.session() as session:
                 self.log_status("Clearing existing graph data...")
-                session.run("MATCH (n) DETACH DELETE n")
-                
-                self.log_status("Creating nodes...")
-                self.create_nodes(session, entities)
-                node_count = session.run("MATCH (n) RETURN count(n) as count").single()
-                self.log_status(f"Verified node count: {node_count['count']}")
-                
-                self.log_status("Creating relationships...")
-                self.create_relationships(session, roles)
-
-                with driver.session() as count_session:
-                    rel_count = count_session.run("MATCH ()-[r]->() RETURN count(r) as count").single()
-                    self.log_status(f"Verified relationship count: {rel_count['count']}")
-                    
-                    stats = count_session.run("""
-                        MATCH (n)
-                        WITH count(DISTINCT n) as nodes
-                        MATCH ()-[r]->()
-                        RETURN nodes, count(DISTINCT r) as relationships
-                    """).single()
-                
+                # Batched delete via APOC instead of one giant transaction,
+                # which locks the store and can exhaust the heap on a graph
+                # with millions of relationships.
+                session.run(
+                    "CALL apoc.periodic.iterate("
+                    "'MATCH (n) RETURN n', 'DETACH DELETE n', "
+                    "{batchSize: 10000, parallel: false})"
+                )
+
+                # One-time schema setup; the entity_id index backs the labeled
+                # endpoint MATCH in create_relationships.
+                self.log_status("Creating constraints and indexes...")
+                session.run("CREATE CONSTRAINT IF NOT EXISTS FOR (n:Entity) REQUIRE n.id IS UNIQUE")
+                session.run("CREATE INDEX entity_id_idx IF NOT EXISTS FOR (n:Entity) ON (n.entity_id)")
+
+                if os.getenv("KG_SERVER_IMPORT"):
+                    self._load_server_side(session, entities_file, roles_file)
+                else:
+                    self.log_status("Creating nodes...")
+                    self.create_nodes(session, self.iter_csv_batches(entities_file))
+                    node_count = session.run("MATCH (n) RETURN count(n) as count").single()
+                    self.log_status(f"Verified node count: {node_count['count']}")
+
+                    self.log_status("Creating relationships...")
+                    self.create_relationships(self.driver, self.iter_csv_batches(roles_file))
+
+                rel_count = session.execute_read(
+                    lambda tx: tx.run("MATCH ()-[r]->() RETURN count(r) as count").single())
+                self.log_status(f"Verified relationship count: {rel_count['count']}")
+
+                stats = session.execute_read(lambda tx: tx.run("""
+                    MATCH (n)
+                    WITH count(DISTINCT n) as nodes
+                    MATCH ()-[r]->()
+                    RETURN nodes, count(DISTINCT r) as relationships
+                """).single())
+
                 if not stats:
                     raise Exception("Failed to retrieve graph statistics - graph may be empty")
                 
                 self.log_status(f"Knowledge graph built successfully:")
                 self.log_status(f"- Nodes: {stats['nodes']}")
                 self.log_status(f"- Relationships: {stats['relationships']}")
-                
-            driver.close()
+
             return True
             
         except Exception as e:
@@ -215,16 +309,14 @@ class KnowledgeGraphClient:
         
         for attempt in range(max_retries):
             try:
-                driver = GraphDatabase.driver(self.neo4j_uri)
-                with driver.session(database="system") as session:
+                with self.driver.session(database="system") as session:
                     result = session.run("SHOW DATABASE neo4j")
                     record = result.single()
                     if record and record["currentStatus"] == "online":
                         self.log_status("Successfully connected to Neo4j")
                     else:
                         raise Exception("Database is not online")
-                driver.close()
-                
+
                 return True
             except Exception as e:
                 if attempt < max_retries - 1:
@@ -239,8 +331,11 @@ if __name__ == "__main__":
     base_path = os.path.dirname(os.path.abspath(__file__))
     entities_path = os.path.join(base_path, '..', "/Users/lmarini/data/combini/Entities.csv")
     roles_path = os.path.join(base_path, '..', "/Users/lmarini/data/combini/Roles.csv")
-    if client.test_connection():
-        client.build_knowledge_graph(
-            entities_path,
-            roles_path,
-        )
\ No newline at end of file
+    try:
+        if client.test_connection():
+            client.build_knowledge_graph(
+                entities_path,
+                roles_path,
+            )
+    finally:
+        client.close()
\ No newline at end of file
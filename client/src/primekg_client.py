@@ -2,6 +2,7 @@ from neo4j import GraphDatabase
 import logging
 import argparse
 import os
+import pandas as pd
 
 # Total relationships: 8100498
 # Total unique nodes: 129375
@@ -35,13 +36,28 @@ class Config:
     NEO4J_URI = os.getenv("NEO4J_URI", "neo4j://localhost:7687")
     
     # Data file paths
-    DATA_DIR = "data"  
+    DATA_DIR = "data"
     KG_FILE = f"{DATA_DIR}/kg.csv"
+    NODES_FILE = f"{DATA_DIR}/unique_nodes.csv"
     
-    # Batch sizes
-    BATCH_SIZE = 10000
+    # Batch sizes (~20k rows per transaction per Neo4j's UNWIND tuning guide)
+    BATCH_SIZE = int(os.getenv("KG_BATCH_SIZE", "20000"))
 
 class Neo4jConnector:
+    # Maps node_type values in the CSV to literal node labels
+    NODE_LABELS = {
+        'gene/protein': 'GeneProtein',
+        'biological_process': 'BiologicalProcess',
+        'disease': 'Disease',
+        'effect/phenotype': 'Phenotype',
+        'anatomy': 'Anatomy',
+        'molecular_function': 'MolecularFunction',
+        'drug': 'Drug',
+        'cellular_component': 'CellularComponent',
+        'pathway': 'Pathway',
+        'exposure': 'Exposure',
+    }
+
     def __init__(self, uri):
         self.driver = GraphDatabase.driver(uri)
         self.logger = self._setup_logger()
@@ -111,55 +127,27 @@ class Neo4jConnector:
                 session.run(index)
 
     def load_nodes(self):
-        # First pass: Create unique nodes
-        create_nodes_query = """
-            CALL apoc.periodic.iterate(
-"LOAD CSV WITH HEADERS FROM 'file:///unique_nodes.csv' AS row RETURN row",
-"CALL {
-    WITH row
-    FOREACH (dummy IN CASE WHEN row.node_type = 'gene/protein' THEN [1] ELSE [] END |
-        CREATE (n:GeneProtein {id: row.node_id, name: row.node_name, index: toInteger(row.index)})
-    )
-    FOREACH (dummy IN CASE WHEN row.node_type = 'biological_process' THEN [1] ELSE [] END |
-        CREATE (n:BiologicalProcess {id: row.node_id, name: row.node_name, index: toInteger(row.index)})
-    )
-    FOREACH (dummy IN CASE WHEN row.node_type = 'disease' THEN [1] ELSE [] END |
-        CREATE (n:Disease {id: row.node_id, name: row.node_name, index: toInteger(row.index)})
-    )
-    FOREACH (dummy IN CASE WHEN row.node_type = 'effect/phenotype' THEN [1] ELSE [] END |
-        CREATE (n:Phenotype {id: row.node_id, name: row.node_name, index: toInteger(row.index)})
-    )
-    FOREACH (dummy IN CASE WHEN row.node_type = 'anatomy' THEN [1] ELSE [] END |
-        CREATE (n:Anatomy {id: row.node_id, name: row.node_name, index: toInteger(row.index)})
-    )
-    FOREACH (dummy IN CASE WHEN row.node_type = 'molecular_function' THEN [1] ELSE [] END |
-        CREATE (n:MolecularFunction {id: row.node_id, name: row.node_name, index: toInteger(row.index)})
-    )
-    FOREACH (dummy IN CASE WHEN row.node_type = 'drug' THEN [1] ELSE [] END |
-        CREATE (n:Drug {id: row.node_id, name: row.node_name, index: toInteger(row.index)})
-    )
-    FOREACH (dummy IN CASE WHEN row.node_type = 'cellular_component' THEN [1] ELSE [] END |
-        CREATE (n:CellularComponent {id: row.node_id, name: row.node_name, index: toInteger(row.index)})
-    )
-    FOREACH (dummy IN CASE WHEN row.node_type = 'pathway' THEN [1] ELSE [] END |
-        CREATE (n:Pathway {id: row.node_id, name: row.node_name, index: toInteger(row.index)})
-    )
-    FOREACH (dummy IN CASE WHEN row.node_type = 'exposure' THEN [1] ELSE [] END |
-        CREATE (n:Exposure {id: row.node_id, name: row.node_name, index: toInteger(row.index)})
-    )
-}",
-{batchSize: 1000, parallel: false}
-);
-        """
-        
+        # Pre-split the CSV by node_type client-side so each label gets one
+        # UNWIND ... CREATE with a literal label, instead of a 10-way FOREACH
+        # cascade evaluated per row on the server.
+        nodes = pd.read_csv(Config.NODES_FILE)
+
         with self.driver.session() as session:
             self.logger.info("Creating nodes...")
-            session.run(create_nodes_query, 
-                       file=Config.KG_FILE, 
-                       batchSize=Config.BATCH_SIZE)
-            
-            count = self.get_node_count("Node")
-            self.logger.info(f"Created {count} nodes")
+            for node_type, group in nodes.groupby('node_type'):
+                label = self.NODE_LABELS[node_type]
+                query = f"""
+                    UNWIND $rows AS row
+                    CREATE (n:{label} {{id: row.node_id, name: row.node_name, index: row.index}})
+                """
+                rows = group.to_dict('records')
+                for i in range(0, len(rows), Config.BATCH_SIZE):
+                    batch = rows[i:i + Config.BATCH_SIZE]
+                    session.execute_write(
+                        lambda tx, q=query, b=batch: tx.run(q, rows=b).consume())
+                self.logger.info(f"Created {len(rows)} {label} nodes")
+
+            self.logger.info(f"Created {len(nodes)} nodes")
 
     def create_relationships(self):
         create_relationships_query = """
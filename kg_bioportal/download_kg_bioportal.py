@@ -11,16 +11,20 @@ Reference: https://ncbo.github.io/kg-bioportal/
 Author: Neo4j Exploration Team
 """
 
+import json
 import pandas as pd
 import requests
 import tarfile
-import tempfile
 import logging
+import threading
 import time
-import re
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from html.parser import HTMLParser
 from pathlib import Path
 from typing import Dict, List, Tuple, Optional
 from urllib.parse import urljoin
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 import os
 
 # Configure logging
@@ -30,6 +34,37 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+# Single C-level pass per string; no regex state machine per cell
+_SANITIZE_TBL = str.maketrans('\r\n\t', '   ')
+
+
+def _sanitize_value(value) -> str:
+    if pd.isna(value):
+        return ''
+    cleaned = str(value).translate(_SANITIZE_TBL)
+    return '' if cleaned == 'nan' else cleaned
+
+
+class _HrefCollector(HTMLParser):
+    """Collects anchor hrefs in one parse pass; sturdier than regexing the
+    raw HTML of the directory listings."""
+
+    def __init__(self):
+        super().__init__()
+        self.hrefs: List[str] = []
+
+    def handle_starttag(self, tag, attrs):
+        if tag == 'a':
+            for name, value in attrs:
+                if name == 'href' and value:
+                    self.hrefs.append(value)
+
+
+def _extract_hrefs(text: str) -> List[str]:
+    collector = _HrefCollector()
+    collector.feed(text)
+    return collector.hrefs
+
 class KGBioportalDownloader:
     """
     Downloads and merges all KG-Bioportal ontologies into a single knowledge graph
@@ -39,7 +74,28 @@ class KGBioportalDownloader:
         self.base_url = "https://kghub.io/kg-bioportal"
         self.output_dir = Path(output_dir)
         self.output_dir.mkdir(exist_ok=True)
-        
+
+        # One pooled session for every request so TCP+TLS handshakes are
+        # paid once per connection, not once per ontology
+        self.session = requests.Session()
+        adapter = HTTPAdapter(
+            pool_connections=32,
+            pool_maxsize=32,
+            max_retries=Retry(total=3, backoff_factor=0.5)
+        )
+        self.session.mount('https://', adapter)
+        self.session.mount('http://', adapter)
+
+        # Rate limiting shared across download threads
+        self._throttle_lock = threading.Lock()
+        self._next_start = 0.0
+
+        # On-disk cache of the ontology listing and per-ontology versions;
+        # reruns skip ~1000 discovery GETs until the TTL expires
+        self.index_cache = self.output_dir / '.index_cache.json'
+        self.index_ttl = 24 * 3600
+        self._versions: Dict[str, List[str]] = {}
+
         # Statistics tracking
         self.stats = {
             'total_ontologies': 0,
@@ -50,30 +106,70 @@ class KGBioportalDownloader:
             'failed_ontologies': []
         }
     
-    def get_all_ontologies(self) -> List[str]:
+    def _load_index_cache(self) -> Optional[Dict]:
+        try:
+            if self.index_cache.exists() and \
+                    time.time() - self.index_cache.stat().st_mtime < self.index_ttl:
+                with open(self.index_cache) as f:
+                    return json.load(f)
+        except Exception as e:
+            logger.warning(f"Ignoring unreadable index cache: {e}")
+        return None
+
+    def _save_index_cache(self, ontologies: List[str]):
+        try:
+            with open(self.index_cache, 'w') as f:
+                json.dump({'ontologies': ontologies, 'versions': self._versions}, f)
+        except Exception as e:
+            logger.warning(f"Failed to write index cache: {e}")
+
+    def get_all_ontologies(self, refresh: bool = False) -> List[str]:
         """
         Get list of all available ontologies from KG-Bioportal
-        
+
+        Uses the on-disk index cache when fresh; pass refresh=True to force a
+        refetch. On a cache miss the per-ontology version listings are
+        prefetched concurrently and cached alongside the acronym list.
+
         Returns:
             List of ontology acronyms
         """
+        if not refresh:
+            cached = self._load_index_cache()
+            if cached is not None:
+                self._versions = cached.get('versions', {})
+                ontologies = cached.get('ontologies', [])
+                logger.info(f"Loaded {len(ontologies)} ontologies from index cache")
+                return ontologies
+
         logger.info("Fetching list of all ontologies...")
-        
+
         try:
-            response = requests.get(self.base_url)
+            response = self.session.get(self.base_url, timeout=(5, 60))
             response.raise_for_status()
             
-            # Extract ontology names from the directory listing
-            # Look for patterns like: href="https://kghub.io/kg-bioportal/ONTOLOGY_NAME"
-            ontology_pattern = r'href="https://kghub\.io/kg-bioportal/([^/"]+)"'
-            ontologies = re.findall(ontology_pattern, response.text)
-            
-            # Filter out non-ontology entries and clean up
-            ontologies = [onto for onto in ontologies if onto and not onto.startswith('http')]
-            
+            # Extract ontology names from the directory listing: anchors
+            # pointing one level below the base URL
+            prefix = f"{self.base_url}/"
+            ontologies = []
+            for href in _extract_hrefs(response.text):
+                if not href.startswith(prefix):
+                    continue
+                tail = href[len(prefix):].strip('/')
+                if tail and '/' not in tail and not tail.startswith('http'):
+                    ontologies.append(tail)
+
             logger.info(f"Found {len(ontologies)} ontologies")
+
+            # Warm the version memo in parallel so the downloaders don't pay
+            # one serial discovery GET each, then persist the whole index
+            logger.info("Prefetching version listings...")
+            with ThreadPoolExecutor(max_workers=16) as executor:
+                executor.map(self.get_ontology_versions, ontologies)
+            self._save_index_cache(ontologies)
+
             return ontologies
-            
+
         except Exception as e:
             logger.error(f"Failed to fetch ontology list: {e}")
             return []
@@ -88,20 +184,31 @@ class KGBioportalDownloader:
         Returns:
             List of version numbers (latest first)
         """
+        cached = self._versions.get(ontology)
+        if cached is not None:
+            return cached
+
         try:
             url = f"{self.base_url}/{ontology}/"
-            response = requests.get(url)
+            response = self.session.get(url, timeout=(5, 60))
             response.raise_for_status()
-            
-            # Parse HTML to find version directories
-            version_pattern = rf'href="https://kghub\.io/kg-bioportal/{ontology}/(\d+)/index\.html"'
-            versions = re.findall(version_pattern, response.text)
-            
+
+            # Version directories link to {base}/{ontology}/{version}/index.html
+            prefix = f"{self.base_url}/{ontology}/"
+            suffix = "/index.html"
+            versions = []
+            for href in _extract_hrefs(response.text):
+                if href.startswith(prefix) and href.endswith(suffix):
+                    version = href[len(prefix):-len(suffix)]
+                    if version.isdigit():
+                        versions.append(version)
+
             # Sort versions numerically (latest first)
             versions = sorted(versions, key=int, reverse=True)
-            
+
+            self._versions[ontology] = versions
             return versions
-            
+
         except Exception as e:
             logger.warning(f"Failed to get versions for {ontology}: {e}")
             return []
@@ -130,199 +237,137 @@ class KGBioportalDownloader:
             
             # Download the tar.gz file
             tar_url = f"{self.base_url}/{ontology}/{version}/{ontology}.tar.gz"
-            response = requests.get(tar_url, stream=True)
+            # identity: the payload is already gzipped; don't let the server
+            # wrap it in a second Content-Encoding layer
+            response = self.session.get(tar_url, stream=True, timeout=(5, 60),
+                                        headers={'Accept-Encoding': 'identity'})
             response.raise_for_status()
-            
-            # Extract the tar.gz file
-            with tempfile.NamedTemporaryFile(suffix='.tar.gz') as temp_file:
-                for chunk in response.iter_content(chunk_size=8192):
-                    temp_file.write(chunk)
-                temp_file.flush()
-                
-                # Extract files
-                with tarfile.open(temp_file.name, 'r:gz') as tar:
-                    tar.extractall(tempfile.gettempdir())
-                
-                # Read nodes and edges files
-                nodes_file = Path(tempfile.gettempdir()) / f"{ontology}_nodes.tsv"
-                edges_file = Path(tempfile.gettempdir()) / f"{ontology}_edges.tsv"
-                
-                if not nodes_file.exists() or not edges_file.exists():
-                    logger.warning(f"Missing files for {ontology}")
-                    return None
-                
-                # Read TSV files with proper handling of line breaks in fields
-                try:
-                    nodes_df = pd.read_csv(nodes_file, sep='\t', low_memory=False, quoting=3, on_bad_lines='skip')
-                    edges_df = pd.read_csv(edges_file, sep='\t', low_memory=False, quoting=3, on_bad_lines='skip')
-                except Exception as e:
-                    logger.warning(f"Failed to read TSV files for {ontology}: {e}")
-                    return None
-                
-                # Add ontology information
-                nodes_df['source_ontology'] = ontology
-                edges_df['source_ontology'] = ontology
-                
-                logger.info(f"Downloaded {ontology}: {len(nodes_df)} nodes, {len(edges_df)} edges")
-                
-                return {
-                    'ontology': ontology,
-                    'version': version,
-                    'nodes': nodes_df,
-                    'edges': edges_df
-                }
-                
+            response.raw.decode_content = True
+
+            # Parse the archive straight off the socket ('r|*' streaming mode),
+            # so decompression overlaps the download and nothing touches disk
+            nodes_df = None
+            edges_df = None
+            try:
+                with tarfile.open(fileobj=response.raw, mode='r|*') as tar:
+                    for member in tar:
+                        name = os.path.basename(member.name)
+                        if name == f"{ontology}_nodes.tsv":
+                            nodes_df = pd.read_csv(tar.extractfile(member), sep='\t',
+                                                   low_memory=False, quoting=3, on_bad_lines='skip')
+                        elif name == f"{ontology}_edges.tsv":
+                            edges_df = pd.read_csv(tar.extractfile(member), sep='\t',
+                                                   low_memory=False, quoting=3, on_bad_lines='skip')
+            except Exception as e:
+                logger.warning(f"Failed to read TSV files for {ontology}: {e}")
+                return None
+
+            if nodes_df is None or edges_df is None:
+                logger.warning(f"Missing files for {ontology}")
+                return None
+
+            # Add ontology information
+            nodes_df['source_ontology'] = ontology
+            edges_df['source_ontology'] = ontology
+
+            logger.info(f"Downloaded {ontology}: {len(nodes_df)} nodes, {len(edges_df)} edges")
+
+            return {
+                'ontology': ontology,
+                'version': version,
+                'nodes': nodes_df,
+                'edges': edges_df
+            }
+
         except Exception as e:
             logger.warning(f"Failed to download {ontology}: {e}")
             return None
     
-    def download_all_ontologies(self, max_ontologies: int = None, delay: float = 1.0) -> Dict[str, Dict]:
+    def _throttle(self, interval: float):
+        """
+        Space request starts ~interval seconds apart across download threads,
+        so concurrency is bounded without cooling the keep-alive connections.
+        """
+        if interval <= 0:
+            return
+        with self._throttle_lock:
+            now = time.monotonic()
+            start_at = max(self._next_start, now)
+            self._next_start = start_at + interval
+        if start_at > now:
+            time.sleep(start_at - now)
+
+    def download_all_ontologies(self, max_ontologies: int = None, delay: float = 1.0,
+                                max_workers: int = 16, consumer=None,
+                                refresh_index: bool = False) -> Dict[str, Dict]:
         """
         Download data for all available ontologies
-        
+
         Args:
             max_ontologies: Maximum number of ontologies to download (None for all)
-            delay: Delay between downloads in seconds
-            
+            delay: Minimum spacing between download starts in seconds
+            max_workers: Number of concurrent download threads
+            consumer: Optional callable invoked with each ontology's data as it
+                arrives; when given, data is not retained in the returned dict
+
         Returns:
-            Dictionary mapping ontology names to their data
+            Dictionary mapping ontology names to their data (empty when a
+            consumer is supplied)
         """
         logger.info("Starting download of all KG-Bioportal ontologies...")
-        
+
         # Get all ontologies
-        all_ontologies = self.get_all_ontologies()
-        
+        all_ontologies = self.get_all_ontologies(refresh=refresh_index)
+
         if max_ontologies:
             all_ontologies = all_ontologies[:max_ontologies]
-        
+
         self.stats['total_ontologies'] = len(all_ontologies)
         downloaded_data = {}
-        
-        for i, ontology in enumerate(all_ontologies, 1):
-            logger.info(f"Processing {ontology} ({i}/{len(all_ontologies)})...")
-            
-            data = self.download_ontology_data(ontology)
-            
-            if data:
-                downloaded_data[ontology] = data
-                self.stats['successful_downloads'] += 1
-                self.stats['total_nodes'] += len(data['nodes'])
-                self.stats['total_edges'] += len(data['edges'])
-                logger.info(f"Successfully downloaded {ontology}")
-            else:
-                self.stats['failed_downloads'] += 1
-                self.stats['failed_ontologies'].append(ontology)
-                logger.warning(f"Failed to download {ontology}")
-            
-            # Be respectful to the server
-            if delay > 0:
-                time.sleep(delay)
-        
+
+        def fetch(ontology):
+            self._throttle(delay)
+            return ontology, self.download_ontology_data(ontology)
+
+        # Downloads are network-bound; socket reads release the GIL, so a
+        # thread pool over the shared session scales close to linearly
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            futures = [executor.submit(fetch, onto) for onto in all_ontologies]
+
+            for i, future in enumerate(as_completed(futures), 1):
+                ontology, data = future.result()
+                logger.info(f"Processed {ontology} ({i}/{len(all_ontologies)})")
+
+                if data:
+                    self.stats['successful_downloads'] += 1
+                    self.stats['total_nodes'] += len(data['nodes'])
+                    self.stats['total_edges'] += len(data['edges'])
+                    if consumer is not None:
+                        # Hand off and drop the DataFrames immediately so peak
+                        # memory stays one ontology, not the whole corpus
+                        consumer(data)
+                    else:
+                        downloaded_data[ontology] = data
+                    logger.info(f"Successfully downloaded {ontology}")
+                else:
+                    self.stats['failed_downloads'] += 1
+                    self.stats['failed_ontologies'].append(ontology)
+                    logger.warning(f"Failed to download {ontology}")
+
         logger.info(f"Download complete: {self.stats['successful_downloads']} successful, {self.stats['failed_downloads']} failed")
         return downloaded_data
     
-    def merge_nodes(self, downloaded_data: Dict[str, Dict]) -> pd.DataFrame:
-        """
-        Merge all node data into a single DataFrame
-        
-        Args:
-            downloaded_data: Dictionary of downloaded ontology data
-            
-        Returns:
-            Merged nodes DataFrame
-        """
-        logger.info("Merging all nodes...")
-        
-        all_nodes = []
-        
-        for ontology, data in downloaded_data.items():
-            nodes_df = data['nodes'].copy()
-            
-            # Ensure we have required columns
-            if 'id' not in nodes_df.columns and 'name' in nodes_df.columns:
-                # Create id from name if missing
-                nodes_df['id'] = nodes_df['name']
-            
-            all_nodes.append(nodes_df)
-        
-        if all_nodes:
-            merged_nodes = pd.concat(all_nodes, ignore_index=True)
-            
-            # Remove duplicates based on id
-            if 'id' in merged_nodes.columns:
-                initial_count = len(merged_nodes)
-                merged_nodes = merged_nodes.drop_duplicates(subset=['id'], keep='first')
-                final_count = len(merged_nodes)
-                logger.info(f"Merged nodes: {initial_count} -> {final_count} (removed {initial_count - final_count} duplicates)")
-            
-            return merged_nodes
-        else:
-            logger.warning("No nodes to merge")
-            return pd.DataFrame()
-    
-    def merge_edges(self, downloaded_data: Dict[str, Dict]) -> pd.DataFrame:
-        """
-        Merge all edge data into a single DataFrame
-        
-        Args:
-            downloaded_data: Dictionary of downloaded ontology data
-            
-        Returns:
-            Merged edges DataFrame
-        """
-        logger.info("Merging all edges...")
-        
-        all_edges = []
-        
-        for ontology, data in downloaded_data.items():
-            edges_df = data['edges'].copy()
-            all_edges.append(edges_df)
-        
-        if all_edges:
-            merged_edges = pd.concat(all_edges, ignore_index=True)
-            logger.info(f"Merged {len(merged_edges)} total edges")
-            return merged_edges
-        else:
-            logger.warning("No edges to merge")
-            return pd.DataFrame()
-    
     def sanitize_dataframe(self, df: pd.DataFrame) -> pd.DataFrame:
         """
         Sanitize all string fields in the DataFrame by removing newlines and tabs
         """
         for col in df.columns:
             if df[col].dtype == object:
-                # Replace NaN with empty string first
-                df[col] = df[col].fillna('')
-                # Then replace newlines and tabs
-                df[col] = df[col].astype(str).str.replace(r'[\r\n\t]', ' ', regex=True)
-                # Remove any remaining 'nan' strings
-                df[col] = df[col].replace('nan', '')
+                # One map handles NaN, newline/tab stripping and stray 'nan'
+                # strings in a single pass over the column
+                df[col] = df[col].map(_sanitize_value)
         return df
     
-    def save_merged_data(self, nodes_df: pd.DataFrame, edges_df: pd.DataFrame) -> Dict[str, str]:
-        """
-        Save merged data as KGX format files, sanitized for Neo4j import
-        """
-        logger.info("Saving merged data...")
-        created_files = {}
-        # Sanitize dataframes
-        nodes_df = self.sanitize_dataframe(nodes_df)
-        edges_df = self.sanitize_dataframe(edges_df)
-        # Save merged nodes
-        if len(nodes_df) > 0:
-            nodes_file = self.output_dir / "merged_nodes.tsv"
-            nodes_df.to_csv(nodes_file, sep='\t', index=False)
-            created_files['nodes'] = str(nodes_file)
-            logger.info(f"Saved {len(nodes_df)} nodes to {nodes_file}")
-        # Save merged edges
-        if len(edges_df) > 0:
-            edges_file = self.output_dir / "merged_edges.tsv"
-            edges_df.to_csv(edges_file, sep='\t', index=False)
-            created_files['edges'] = str(edges_file)
-            logger.info(f"Saved {len(edges_df)} edges to {edges_file}")
-        return created_files
-    
     def print_statistics(self):
         """Print download and merge statistics"""
         print("\n" + "="*60)
@@ -342,47 +387,91 @@ class KGBioportalDownloader:
             if len(self.stats['failed_ontologies']) > 10:
                 print(f"  ... and {len(self.stats['failed_ontologies']) - 10} more")
     
-    def process_all_ontologies(self, max_ontologies: int = None, delay: float = 1.0) -> Dict:
+    def process_all_ontologies(self, max_ontologies: int = None, delay: float = 1.0,
+                               refresh_index: bool = False) -> Dict:
         """
         Main processing pipeline for all KG-Bioportal ontologies
-        
+
         Args:
             max_ontologies: Maximum number of ontologies to download
             delay: Delay between downloads in seconds
-            
+            refresh_index: Refetch the ontology index even if the cache is fresh
+
         Returns:
             Processing results dictionary
         """
         logger.info("Starting complete KG-Bioportal processing...")
-        
+
         try:
-            # Download all ontology data
-            downloaded_data = self.download_all_ontologies(max_ontologies, delay)
-            
-            if not downloaded_data:
+            nodes_file = self.output_dir / "merged_nodes.tsv"
+            edges_file = self.output_dir / "merged_edges.tsv"
+
+            # Stream each ontology into the merged TSVs as it arrives instead
+            # of holding ~1050 DataFrames for one giant pd.concat at the end;
+            # peak memory is one ontology regardless of corpus size. Columns
+            # are pinned to the first ontology's layout so every appended
+            # chunk lines up with the header row.
+            seen_ids = set()
+            state = {'nodes_cols': None, 'edges_cols': None,
+                     'nodes': 0, 'edges': 0, 'duplicates': 0}
+
+            with open(nodes_file, 'w') as nodes_out, open(edges_file, 'w') as edges_out:
+                def append_merged(data):
+                    nodes_df = self.sanitize_dataframe(data['nodes'])
+                    edges_df = self.sanitize_dataframe(data['edges'])
+
+                    # Ensure we have required columns
+                    if 'id' not in nodes_df.columns and 'name' in nodes_df.columns:
+                        nodes_df['id'] = nodes_df['name']
+
+                    if 'id' in nodes_df.columns:
+                        before = len(nodes_df)
+                        # Drop repeats inside this ontology first - the
+                        # seen_ids filter only catches ids from earlier ones
+                        nodes_df = nodes_df.drop_duplicates(subset=['id'])
+                        nodes_df = nodes_df[~nodes_df['id'].isin(seen_ids)]
+                        state['duplicates'] += before - len(nodes_df)
+                        seen_ids.update(nodes_df['id'])
+
+                    if state['nodes_cols'] is None:
+                        state['nodes_cols'] = list(nodes_df.columns)
+                        state['edges_cols'] = list(edges_df.columns)
+                    else:
+                        nodes_df = nodes_df.reindex(columns=state['nodes_cols'], fill_value='')
+                        edges_df = edges_df.reindex(columns=state['edges_cols'], fill_value='')
+
+                    nodes_df.to_csv(nodes_out, sep='\t', index=False,
+                                    header=(state['nodes'] == 0))
+                    edges_df.to_csv(edges_out, sep='\t', index=False,
+                                    header=(state['edges'] == 0))
+                    state['nodes'] += len(nodes_df)
+                    state['edges'] += len(edges_df)
+
+                self.download_all_ontologies(max_ontologies, delay, consumer=append_merged,
+                                             refresh_index=refresh_index)
+
+            if state['nodes'] == 0 and state['edges'] == 0:
                 return {
                     'success': False,
                     'error': 'No data downloaded'
                 }
-            
-            # Merge nodes and edges
-            nodes_df = self.merge_nodes(downloaded_data)
-            edges_df = self.merge_edges(downloaded_data)
-            
-            # Save merged data
-            created_files = self.save_merged_data(nodes_df, edges_df)
-            
+
+            logger.info(f"Merged {state['nodes']} nodes ({state['duplicates']} duplicates dropped) "
+                        f"and {state['edges']} edges")
+
+            created_files = {'nodes': str(nodes_file), 'edges': str(edges_file)}
+
             # Print statistics
             self.print_statistics()
-            
+
             return {
                 'success': True,
-                'total_entities': len(nodes_df),
-                'total_relationships': len(edges_df),
+                'total_entities': state['nodes'],
+                'total_relationships': state['edges'],
                 'files': created_files,
                 'statistics': self.stats
             }
-            
+
         except Exception as e:
             logger.error(f"Processing failed: {e}")
             return {
@@ -401,7 +490,9 @@ def main():
                        help='Output directory for merged files')
     parser.add_argument('--delay', type=float, default=1.0,
                        help='Delay between downloads in seconds (default: 1.0)')
-    
+    parser.add_argument('--refresh-index', action='store_true',
+                       help='Refetch the ontology index even if the cache is fresh')
+
     args = parser.parse_args()
     
     downloader = KGBioportalDownloader(output_dir=args.output_dir)
@@ -409,7 +500,8 @@ def main():
     # Process all ontologies
     results = downloader.process_all_ontologies(
         max_ontologies=args.max_ontologies,
-        delay=args.delay
+        delay=args.delay,
+        refresh_index=args.refresh_index
     )
     
     if results['success']:
@@ -4,55 +4,77 @@ Convert merged nodes and edges TSVs to Neo4j-admin compatible CSVs.
 Preserves all original columns and adds Neo4j-admin import headers and columns.
 """
 import sys
+import numpy as np
 import pandas as pd
 import argparse
 import csv
 from pathlib import Path
 
-def clean_label(category):
-    if pd.isna(category) or str(category).strip() == '':
-        return 'UnknownCategory'
-    if str(category).startswith('http'):
-        return 'ExternalCategory'
-    if ':' in str(category):
-        return str(category).split(':', 1)[1]
-    return str(category)
+def clean_label(categories: pd.Series) -> pd.Series:
+    """Vectorized label cleanup; one C-level pass per operation instead of a
+    Python callback per row."""
+    s = categories.fillna('').astype(str)
+    stripped = s.str.strip()
+    # split(':', 1)[-1] leaves colon-free strings unchanged, matching the
+    # scalar fallthrough
+    colon_tail = s.str.split(':', n=1).str[-1]
+    out = np.where(stripped == '', 'UnknownCategory',
+          np.where(s.str.startswith('http'), 'ExternalCategory', colon_tail))
+    return pd.Series(out, index=s.index)
 
-def clean_type(predicate):
-    if pd.isna(predicate) or str(predicate).strip() == '':
-        return 'RELATED_TO'
-    s = str(predicate)
-    if s.startswith('http') or '/' in s or '\\' in s:
-        # Replace backslashes with slashes, remove trailing slashes, split, get last non-empty
-        s = s.replace('\\', '/')
-        s = s.rstrip('/')
-        parts = [p for p in s.split('/') if p]
-        if parts:
-            return parts[-1].replace(':', '_').upper()
-        else:
-            return 'RELATED_TO'
-    if ':' in s:
-        return s.split(':', 1)[1].replace(':', '_').upper()
-    return s.replace(':', '_').upper()
+def clean_type(predicates: pd.Series) -> pd.Series:
+    """Vectorized relationship-type cleanup mirroring the old per-row logic:
+    URL/path-like values keep their last non-empty path segment; everything
+    else drops a leading CURIE prefix; colons become underscores, uppercased."""
+    s = predicates.fillna('').astype(str)
+    stripped = s.str.strip()
+    pathlike = s.str.startswith('http') | s.str.contains('/', regex=False) | \
+        s.str.contains('\\', regex=False)
+    # Replace backslashes with slashes, remove trailing slashes, keep the
+    # last non-empty segment
+    tail = s.str.replace('\\', '/', regex=False).str.rstrip('/') \
+        .str.rsplit('/', n=1).str[-1] \
+        .str.replace(':', '_', regex=False).str.upper()
+    colon_tail = s.str.split(':', n=1).str[-1] \
+        .str.replace(':', '_', regex=False).str.upper()
+    out = np.where(stripped == '', 'RELATED_TO',
+          np.where(pathlike, np.where(tail == '', 'RELATED_TO', tail), colon_tail))
+    return pd.Series(out, index=s.index)
+
+# Rows per chunk when streaming the merged TSVs; keeps memory bounded no
+# matter how many ontologies were merged
+CHUNK_ROWS = 200_000
 
 def process_nodes_tsv(input_path, output_path):
-    df = pd.read_csv(input_path, sep='\t', dtype=str, keep_default_na=False)
-    df[':LABEL'] = df['category'].apply(clean_label)
-    df['id:ID'] = df['id']
-    # Place id:ID and :LABEL at the front/back
-    cols = ['id:ID'] + [c for c in df.columns if c not in ['id', 'id:ID', ':LABEL']] + [':LABEL']
-    df[cols].to_csv(output_path, index=False, header=False, quoting=csv.QUOTE_MINIMAL)
-    print(f"Wrote nodes CSV: {output_path}")
+    rows = 0
+    cols = None
+    with open(output_path, 'w', newline='') as out:
+        for df in pd.read_csv(input_path, sep='\t', dtype=str, keep_default_na=False,
+                              chunksize=CHUNK_ROWS):
+            df[':LABEL'] = clean_label(df['category'])
+            df['id:ID'] = df['id']
+            if cols is None:
+                # Place id:ID and :LABEL at the front/back
+                cols = ['id:ID'] + [c for c in df.columns if c not in ['id', 'id:ID', ':LABEL']] + [':LABEL']
+            df[cols].to_csv(out, index=False, header=False, quoting=csv.QUOTE_MINIMAL)
+            rows += len(df)
+    print(f"Wrote nodes CSV: {output_path} ({rows} rows)")
 
 def process_edges_tsv(input_path, output_path):
-    df = pd.read_csv(input_path, sep='\t', dtype=str, keep_default_na=False)
-    df[':TYPE'] = df['predicate'].apply(clean_type)
-    df[':START_ID'] = df['subject']
-    df[':END_ID'] = df['object']
-    # Place :START_ID, :END_ID, :TYPE at the front, rest as properties
-    cols = [':START_ID', ':END_ID', ':TYPE'] + [c for c in df.columns if c not in [':START_ID', ':END_ID', ':TYPE']]
-    df[cols].to_csv(output_path, index=False, header=False, quoting=csv.QUOTE_MINIMAL)
-    print(f"Wrote edges CSV: {output_path}")
+    rows = 0
+    cols = None
+    with open(output_path, 'w', newline='') as out:
+        for df in pd.read_csv(input_path, sep='\t', dtype=str, keep_default_na=False,
+                              chunksize=CHUNK_ROWS):
+            df[':TYPE'] = clean_type(df['predicate'])
+            df[':START_ID'] = df['subject']
+            df[':END_ID'] = df['object']
+            if cols is None:
+                # Place :START_ID, :END_ID, :TYPE at the front, rest as properties
+                cols = [':START_ID', ':END_ID', ':TYPE'] + [c for c in df.columns if c not in [':START_ID', ':END_ID', ':TYPE']]
+            df[cols].to_csv(out, index=False, header=False, quoting=csv.QUOTE_MINIMAL)
+            rows += len(df)
+    print(f"Wrote edges CSV: {output_path} ({rows} rows)")
 
 def main():
     parser = argparse.ArgumentParser(description="Convert merged nodes and edges TSVs to Neo4j-admin compatible CSVs.")
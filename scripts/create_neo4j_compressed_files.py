@@ -8,16 +8,35 @@ Neo4j supports .gz compressed files directly during import.
 
 import os
 import sys
-import gzip
 import shutil
 import argparse
+from concurrent.futures import ProcessPoolExecutor
 from pathlib import Path
 import logging
 
+try:
+    # ISA-L's SIMD deflate emits the same gzip bitstream 2-4x faster;
+    # its levels stop at 3 (~stock zlib level 6 ratio)
+    from isal import igzip as gzip_impl
+    _MAX_COMPRESSION_LEVEL = 3
+except ImportError:
+    import gzip as gzip_impl
+    _MAX_COMPRESSION_LEVEL = 9
+
 # Set up logging
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
 logger = logging.getLogger(__name__)
 
+def _compress_one(file_path, gzip_path, compression_level):
+    """Compress one CSV to gzip; module-level so process-pool workers can pickle it"""
+    compression_level = min(compression_level, _MAX_COMPRESSION_LEVEL)
+    # 1 MiB buffers on both sides: fewer syscalls and fewer deflate flush
+    # boundaries than the 16 KB copyfileobj default
+    with open(file_path, 'rb', buffering=1 << 20) as f_in:
+        with gzip_impl.open(gzip_path, 'wb', compresslevel=compression_level) as f_out:
+            shutil.copyfileobj(f_in, f_out, length=1 << 20)
+    return gzip_path.stat().st_size
+
 class Neo4jCompressor:
     def __init__(self, source_dir="neo4j_import_files", output_dir="neo4j_compressed"):
         self.source_dir = Path(source_dir)
@@ -29,8 +48,11 @@ class Neo4jCompressor:
         if not self.source_dir.exists():
             raise FileNotFoundError(f"Source directory {self.source_dir} does not exist")
         
-        # Only process CSV files for Neo4j import
+        # Only process CSV files for Neo4j import; largest first so the
+        # longest compressions start immediately and no core idles at the
+        # tail waiting on one big straggler
         files = [f for f in self.source_dir.iterdir() if f.is_file() and f.suffix.lower() == '.csv']
+        files.sort(key=lambda f: f.stat().st_size, reverse=True)
         logger.info(f"Found {len(files)} CSV files to compress")
         return files
     
@@ -57,25 +79,27 @@ class Neo4jCompressor:
         logger.info(f"Original total size: {self.format_size(total_original_size)}")
         
         compressed_files = []
-        
-        for file_path in files:
-            # Keep the .csv extension in the compressed filename for Neo4j compatibility
-            gzip_path = self.output_dir / f"{file_path.name}.gz"
-            
-            logger.info(f"Compressing {file_path.name}...")
-            
-            with open(file_path, 'rb') as f_in:
-                with gzip.open(gzip_path, 'wb', compresslevel=compression_level) as f_out:
-                    shutil.copyfileobj(f_in, f_out)
-            
-            compressed_size = gzip_path.stat().st_size
-            total_compressed_size += compressed_size
-            compressed_files.append(gzip_path)
-            
-            original_size = file_path.stat().st_size
-            compression_ratio = (1 - compressed_size / original_size) * 100
-            
-            logger.info(f"  {file_path.name}: {self.format_size(original_size)} -> {self.format_size(compressed_size)} ({compression_ratio:.1f}% compression)")
+
+        # Deflate at level 9 is compute-bound and the files are independent,
+        # so compress them across all cores at once
+        with ProcessPoolExecutor(max_workers=os.cpu_count()) as executor:
+            jobs = []
+            for file_path in files:
+                # Keep the .csv extension in the compressed filename for Neo4j compatibility
+                gzip_path = self.output_dir / f"{file_path.name}.gz"
+                logger.info(f"Compressing {file_path.name}...")
+                jobs.append((file_path, gzip_path,
+                             executor.submit(_compress_one, file_path, gzip_path, compression_level)))
+
+            for file_path, gzip_path, job in jobs:
+                compressed_size = job.result()
+                total_compressed_size += compressed_size
+                compressed_files.append(gzip_path)
+
+                original_size = file_path.stat().st_size
+                compression_ratio = (1 - compressed_size / original_size) * 100
+
+                logger.info(f"  {file_path.name}: {self.format_size(original_size)} -> {self.format_size(compressed_size)} ({compression_ratio:.1f}% compression)")
         
         overall_compression = (1 - total_compressed_size / total_original_size) * 100
         logger.info(f"Gzip compression complete!")
@@ -85,7 +109,7 @@ class Neo4jCompressor:
         
         return compressed_files, total_compressed_size
     
-    def create_import_script(self, compressed_files):
+    def create_import_script(self, compressed_files, presort=False):
         """Create a Neo4j import script using the compressed files"""
         script_path = self.output_dir / "neo4j_import.sh"
         
@@ -98,7 +122,10 @@ class Neo4jCompressor:
             f.write("# Generated automatically by create_neo4j_compressed_files.py\n\n")
             
             f.write(f"NEO4J_HOME={neo4j_home}\n")
-            f.write("IMPORT_DIR=$(pwd)\n\n")
+            f.write("IMPORT_DIR=$(pwd)\n")
+            f.write("# Import tuning - override via environment if the defaults don't fit\n")
+            f.write("THREADS=${THREADS:-$(nproc)}\n")
+            f.write("MAX_MEM=${MAX_MEM:-80%}\n\n")
             
             f.write("# Stop Neo4j before import\n")
             f.write("echo 'Stopping Neo4j...'\n")
@@ -109,6 +136,17 @@ class Neo4jCompressor:
             f.write("rm -rf $NEO4J_HOME/data/databases/neo4j\n")
             f.write("rm -rf $NEO4J_HOME/data/transactions/neo4j\n\n")
             
+            if presort:
+                f.write("# Pre-sort inputs by primary ID (the first column: id:ID for\n")
+                f.write("# nodes, :START_ID for relationships) so the importer's ID mapper\n")
+                f.write("# sees mostly-sequential keys\n")
+                f.write("echo 'Pre-sorting import files...'\n")
+                f.write("for f in *.csv.gz; do\n")
+                f.write("  gunzip -c \"$f\" | { IFS= read -r header; echo \"$header\"; \\\n")
+                f.write("    LC_ALL=C sort -t, -k1,1 -S 1G --parallel=$THREADS; } | gzip > \"$f.sorted\"\n")
+                f.write("  mv \"$f.sorted\" \"$f\"\n")
+                f.write("done\n\n")
+
             f.write("# Run import with compressed files\n")
             f.write("echo 'Starting Neo4j import...'\n")
             f.write("$NEO4J_HOME/bin/neo4j-admin import \\\n")
@@ -130,6 +168,9 @@ class Neo4jCompressor:
             f.write("  --array-delimiter=; \\\n")
             f.write("  --skip-bad-relationships=true \\\n")
             f.write("  --skip-duplicate-nodes=true \\\n")
+            f.write("  --threads=$THREADS \\\n")
+            f.write("  --max-memory=$MAX_MEM \\\n")
+            f.write("  --read-buffer-size=16m \\\n")
             f.write("  --high-io=true\n\n")
             
             f.write("# Start Neo4j\n")
@@ -202,6 +243,9 @@ class Neo4jCompressor:
             f.write("     --array-delimiter=; \\\n")
             f.write("     --skip-bad-relationships=true \\\n")
             f.write("     --skip-duplicate-nodes=true \\\n")
+            f.write("     --threads=$(nproc) \\\n")
+            f.write("     --max-memory=80% \\\n")
+            f.write("     --read-buffer-size=16m \\\n")
             f.write("     --high-io=true\n")
             f.write("   ```\n")
             f.write("4. Start Neo4j: `$NEO4J_HOME/bin/neo4j start`\n\n")
@@ -211,6 +255,7 @@ class Neo4jCompressor:
             f.write("- The import process will automatically decompress the files\n")
             f.write("- Make sure you have enough disk space for the uncompressed data\n")
             f.write("- The import process may take several minutes depending on your system\n")
+            f.write("- Override `THREADS` / `MAX_MEM` in the environment if the import box is shared\n")
         
         logger.info(f"Created README file: {readme_path}")
 
@@ -218,7 +263,8 @@ def main():
     parser = argparse.ArgumentParser(description="Create compressed Neo4j import files")
     parser.add_argument("--source", default="neo4j_import_files", help="Source directory (default: neo4j_import_files)")
     parser.add_argument("--output", default="neo4j_compressed", help="Output directory (default: neo4j_compressed)")
-    parser.add_argument("--compression-level", type=int, default=9, help="Compression level 1-9 (default: 9)")
+    parser.add_argument("--compression-level", type=int, default=3, help="Compression level 1-9 (default: 3; use 9 for archival runs)")
+    parser.add_argument("--presort", action="store_true", help="Sort import files by primary ID in the generated script before running neo4j-admin")
     parser.add_argument("--no-script", action="store_true", help="Don't create import script")
     parser.add_argument("--no-readme", action="store_true", help="Don't create README file")
     
@@ -232,7 +278,7 @@ def main():
         
         # Create import script
         if not args.no_script:
-            compressor.create_import_script(compressed_files)
+            compressor.create_import_script(compressed_files, presort=args.presort)
         
         # Create README
         if not args.no_readme:
@@ -1,62 +1,72 @@
 import csv
 import os
-from collections import defaultdict
+import subprocess
 
 def merge_duplicates(input_file, output_file):
     """
     Process a CSV file to add a frequency column and merge duplicate rows.
     Duplicates are identified by having the same values in the first three columns.
+
+    GNU sort groups identical keys adjacently out-of-core, so counting is a
+    single streaming pass over consecutive rows instead of a dict holding
+    every unique key in memory.
     """
     print(f"Processing {input_file}...")
-    
-    # Dictionary to store unique rows and their frequencies
-    unique_rows = defaultdict(int)
-    
-    # Read the input CSV file
+
+    # Grab the header, then sort the body so duplicate keys sit next to
+    # each other
     with open(input_file, 'r', newline='') as csvfile:
-        reader = csv.reader(csvfile)
-        
-        # Get the header row
-        header = next(reader)
-        
-        # Process each row in the CSV
-        for row in reader:
-            if len(row) >= 3:
-                # Use the first three columns as the key
-                key = tuple(row[:3])
-                # Increment the frequency for this key
-                unique_rows[key] += 1
-    
-    print(f"Found {len(unique_rows)} unique relationships")
-    
-    # Write the results to the output CSV file
-    with open(output_file, 'w', newline='') as csvfile:
-        writer = csv.writer(csvfile)
-        
-        # Write the header row with the new frequency column
-        new_header = header + ['frequency']
-        writer.writerow(new_header)
-        
-        # Write each unique row with its frequency
-        for key, frequency in unique_rows.items():
-            # Convert the key back to a list and add the frequency
-            row = list(key)
-            # Add any additional columns from the original data if needed
-            # If the original row had more than 3 columns, you might want to handle that here
-            row.append(str(frequency))
-            writer.writerow(row)
-    
+        header = next(csv.reader(csvfile))
+
+    sorted_file = output_file + '.sorted.tmp'
+    sort_cmd = (
+        f"tail -n +2 '{input_file}' | "
+        f"LC_ALL=C sort -t, -k1,3 -S 1G --parallel={os.cpu_count()} > '{sorted_file}'"
+    )
+    subprocess.run(["sh", "-c", sort_cmd], check=True)
+
+    unique_count = 0
+    try:
+        with open(sorted_file, 'r', newline='') as sorted_rows, \
+             open(output_file, 'w', newline='') as out:
+            reader = csv.reader(sorted_rows)
+            writer = csv.writer(out)
+
+            # Write the header row with the new frequency column
+            writer.writerow(header + ['frequency'])
+
+            current = None
+            frequency = 0
+            for row in reader:
+                if len(row) < 3:
+                    continue
+                key = row[:3]
+                if key != current:
+                    if current is not None:
+                        writer.writerow(current + [str(frequency)])
+                        unique_count += 1
+                    current = key
+                    frequency = 0
+                frequency += 1
+
+            if current is not None:
+                writer.writerow(current + [str(frequency)])
+                unique_count += 1
+    finally:
+        if os.path.exists(sorted_file):
+            os.remove(sorted_file)
+
+    print(f"Found {unique_count} unique relationships")
     print(f"Results saved to {output_file}")
 
 if __name__ == "__main__":
     # Default file paths - adjust as needed
     input_file = "data/connections.csv"
     output_file = "data/connections_with_frequency.csv"
-    
+
     # Check if input file exists
     if not os.path.exists(input_file):
         print(f"Error: Input file {input_file} not found.")
         exit(1)
-    
-    merge_duplicates(input_file, output_file)
 
+    merge_duplicates(input_file, output_file)
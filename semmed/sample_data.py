@@ -1,34 +1,49 @@
 import os
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
-from multiprocessing import Pool
 from typing import Tuple
 
 def process_file(args: Tuple[str, str, int]) -> str:
     """
     Process a single file by sampling n lines.
-    
+
+    Copies in 4 MiB binary blocks and counts newlines with bytes.count,
+    so the inner loop is a C memchr scan rather than per-line decode.
+
     Args:
         args: Tuple containing (source_path, dest_path, n_lines)
     Returns:
         str: Filename that was processed
     """
     source_path, dest_path, n_lines = args
-    
-    with open(source_path, 'r', encoding='utf-8') as source, \
-         open(dest_path, 'w', encoding='utf-8') as dest:
-        # Copy first n_lines lines
-        for i, line in enumerate(source):
-            if i >= n_lines:
+    block_size = 4 * 1024 * 1024
+    remaining = n_lines
+
+    with open(source_path, 'rb') as source, open(dest_path, 'wb') as dest:
+        while remaining > 0:
+            block = source.read(block_size)
+            if not block:
                 break
-            dest.write(line)
-    
+            newlines = block.count(b'\n')
+            if newlines < remaining:
+                dest.write(block)
+                remaining -= newlines
+            else:
+                # The cut point is just past the remaining-th newline
+                pos = -1
+                for _ in range(remaining):
+                    pos = block.find(b'\n', pos + 1)
+                dest.write(block[:pos + 1])
+                remaining = 0
+
     return os.path.basename(source_path)
 
 def sample_files(source_dir: str, dest_dir: str, n_lines: int = 100_000, n_workers: int = None):
     """
     Sample the first n lines from each CSV file in source_dir and save to dest_dir.
-    Uses multiprocessing for parallel processing.
-    
+    Uses a thread pool: the work is pure I/O, so threads overlap reads and
+    writes without process spawn or pickling overhead.
+
     Args:
         source_dir: Directory containing the original data files
         dest_dir: Directory where sampled files will be stored
@@ -50,8 +65,9 @@ def sample_files(source_dir: str, dest_dir: str, n_lines: int = 100_000, n_worke
     ]
     
     # Process files in parallel
-    with Pool(processes=n_workers) as pool:
-        for filename in pool.imap_unordered(process_file, process_args):
+    workers = n_workers or min(32, max(1, len(csv_files)))
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        for filename in executor.map(process_file, process_args):
             print(f"Processed: {filename}")
 
 def main():
@@ -1,5 +1,5 @@
-from fastapi import FastAPI, HTTPException
-from neo4j import GraphDatabase
+from fastapi import FastAPI, Depends, HTTPException
+from neo4j import AsyncGraphDatabase
 import os
 import uvicorn
 import logging
@@ -14,25 +14,43 @@ app = FastAPI()
 uri = os.getenv("NEO4J_URI", "neo4j://localhost:7687")
 logger.info(f"Connecting to Neo4j at {uri}")
 
-# Create Neo4j driver
-try:
-    driver = GraphDatabase.driver(uri)
-    # Verify connection
-    with driver.session() as session:
-        result = session.run("RETURN 1")
-        result.single()
-    logger.info("Successfully connected to Neo4j")
-except Exception as e:
-    logger.error(f"Failed to connect to Neo4j: {str(e)}")
-    raise
+# One pooled driver for the whole process; sessions are lightweight
+# handles over it, so per-request work never re-dials Bolt
+driver = AsyncGraphDatabase.driver(
+    uri,
+    max_connection_pool_size=50,
+    connection_acquisition_timeout=60,
+)
+
+async def get_session():
+    async with driver.session() as session:
+        yield session
+
+@app.on_event("startup")
+async def warm_up():
+    # Open a connection eagerly so the first request doesn't pay the
+    # Bolt handshake
+    try:
+        await driver.verify_connectivity()
+        logger.info("Successfully connected to Neo4j")
+    except Exception as e:
+        logger.error(f"Failed to connect to Neo4j: {str(e)}")
+        raise
+
+@app.on_event("shutdown")
+async def shut_down():
+    await driver.close()
 
 @app.get("/health")
-async def health_check():
+async def health_check(session=Depends(get_session)):
     try:
-        with driver.session() as session:
-            result = session.run("RETURN 1")
-            result.single()
+        result = await session.run("RETURN 1")
+        await result.single()
         logger.info("Health check passed")
         return {"status": "healthy"}
     except Exception as e:
-        logger
\ No newline at end of file
+        logger.error(f"Health check failed: {str(e)}")
+        raise HTTPException(status_code=503, detail="Neo4j connection unavailable")
+
+if __name__ == "__main__":
+    uvicorn.run(app, host="0.0.0.0", port=8000)